@@ -9,155 +9,299 @@ Goal:
 - DO NOT hard-reject everything just because a note marker appears early in raw HTML.
 """
 
+import html
 import json
 import sys
 import re
 import os
-from html.parser import HTMLParser
+from functools import lru_cache
+
+try:
+    import ahocorasick  # optional C extension; we fall back to str.find scans
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson  # optional C-backed JSON; we fall back to stdlib json
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def _json_loads(raw):
+        return orjson.loads(raw)
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+else:
+    def _json_loads(raw):
+        return json.loads(raw)
+
+    def _json_dumps(obj) -> str:
+        # compact separators to match orjson's output shape
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+# Debug output (reason strings, top-3 summary, amount_debug JSON) is
+# write-only noise in production; only pay for it when asked.
+_EMIT_DEBUG = os.getenv("PARSER_DEBUG") == "1"
 
 
 # ----------------------------
 # HTML stripping + normalization
 # ----------------------------
 
-class HTMLStripper(HTMLParser):
-    """Simple HTML tag stripper"""
-    def __init__(self):
-        super().__init__()
-        self.text = []
-
-    def handle_data(self, data):
-        self.text.append(data)
-
-    def get_text(self):
-        return " ".join(self.text)
+_TAG_RE = re.compile(r"<[^>]+>")
 
 
 def strip_html(html_content: str) -> str:
     """Strip HTML tags from content"""
     if not html_content:
         return ""
-    try:
-        stripper = HTMLStripper()
-        stripper.feed(html_content)
-        return stripper.get_text()
-    except Exception:
-        # If HTML parsing fails, return original (will be handled by regex)
-        return html_content
+    # One C-level substitution beats driving HTMLParser's state machine,
+    # and it doesn't choke on malformed markup.
+    text = _TAG_RE.sub(" ", html_content)
+    if "&" in text:
+        text = html.unescape(text)
+    return text
 
 
 def normalize_text(text: str) -> str:
-    """Normalize text: strip html, lowercase, collapse whitespace"""
+    """
+    Normalize text: strip html, collapse whitespace.
+
+    Case is left alone -- every downstream scan is case-insensitive, which
+    saves allocating a lowercased copy of the whole email.
+    """
     if not text:
         return ""
     text = strip_html(text)
-    text = re.sub(r"\s+", " ", text)
-    return text.lower().strip()
+    # split/join runs entirely in C and collapses runs + trims ends in one
+    # pass, beating a \s+ regex substitution plus strip
+    return " ".join(text.split())
 
 
 # ----------------------------
-# Note-region detection (soft guidance only)
+# Combined text scan: currency candidates + note marker (soft guidance only)
 # ----------------------------
 
-def find_note_region_start(text: str):
+# One alternation so a single finditer pass finds everything:
+#   dol:  $-prefixed amounts, with or without decimals ($10, $10.00, $1,234.56)
+#   dec:  bare decimal amounts ("10.00", "1,234.56", "10.00 usd")
+#   note: note/memo/message region markers, both the "field-style" ("note:")
+#         and bare-word forms -- the field variants start at the same word
+#         position, so the earliest bare match is the earliest marker.
+#         "for" only counts in its field form ("for:"); the bare word is
+#         everyday English ("payment for services") and marked nearly every
+#         email as note region from the first sentence on.
+# Marker words are alphabetic and currency tokens are not, so the branches
+# can never steal each other's matches.
+_SCAN_RE = re.compile(
+    r"\$\s*(?P<dol>[\d,]+(?:\.\d+)?)"
+    r"|(?P<dec>[\d,]+\.\d{2})\b"
+    r"|(?P<note>\b(?:note|memo|message|remark|description)\b|\bfor\s*:)",
+    re.IGNORECASE,
+)
+
+# Cheap pre-filters: anything _CURRENCY_RE can match contains either a "$"
+# or a two-decimal number, and any candidate at all needs a digit.
+_DECIMAL_RE = re.compile(r"\d\.\d{2}")
+_DIGIT_RE = re.compile(r"\d")
+
+
+def scan_text(text: str):
     """
-    Find an approximate "note/memo/message" region start.
+    Single pass over the text for currency candidates and the note marker.
+
+    Returns (values, starts, ends, matched_texts, note_region_start,
+    note_marker). Candidates come back as parallel lists in document order --
+    the scoring pipeline only touches values/starts/ends, so there is no
+    reason to box each candidate in a dict. A single regex pass can't
+    double-match the same span, so no de-dup is needed.
 
-    IMPORTANT:
-    - This is a *soft* signal only.
+    The note marker is a *soft* signal only:
     - Some email HTML puts the word "note" early in the markup even if the actual note is later.
     - So we NEVER blanket-reject all amounts after this index.
     """
-    # Prefer markers with ":" or " - " which are more like fields
-    marker_patterns = [
-        r"\bnote\s*:",
-        r"\bmemo\s*:",
-        r"\bmessage\s*:",
-        r"\bremark\s*:",
-        r"\bdescription\s*:",
-        r"\bfor\s*:",
-
-        # Also allow looser markers, but these are weaker signals
-        r"\bnote\b",
-        r"\bmemo\b",
-        r"\bmessage\b",
-        r"\bremark\b",
-        r"\bdescription\b",
-        r"\bfor\b",
-    ]
-
-    earliest_pos = None
-    earliest_marker = None
-
-    for pat in marker_patterns:
-        for m in re.finditer(pat, text, re.IGNORECASE):
-            pos = m.start()
-            if earliest_pos is None or pos < earliest_pos:
-                earliest_pos = pos
-                earliest_marker = pat
+    values = []
+    starts = []
+    ends = []
+    matched_texts = []
+    note_region_start = None
+    note_marker = None
+
+    for match in _SCAN_RE.finditer(text):
+        group = match.lastgroup
+        if group == "note":
+            if note_region_start is None:
+                note_region_start = match.start()
+                note_marker = match.group(0)
+            continue
 
-    return (earliest_pos, earliest_marker) if earliest_pos is not None else (None, None)
+        raw = match.group(group)
+        amt_str = raw.replace(",", "")
+        try:
+            value = float(amt_str)
+        except ValueError:
+            continue
+        if value > 0:
+            values.append(value)
+            starts.append(match.start())
+            ends.append(match.end())
+            matched_texts.append(match.group(0))
 
+    return (values, starts, ends, matched_texts, note_region_start, note_marker)
 
-# ----------------------------
-# Currency candidate extraction
-# ----------------------------
 
 def extract_currency_candidates(text: str):
     """
-    Extract possible currency candidates.
+    Extract possible currency candidates (see scan_text).
 
     Returns list of dict:
       { value, start, end, matched, full_match }
     """
-    candidates = []
-
-    # Covers: $10, $10.00, 10.00, 1,234.56, 10.00 usd, etc.
-    patterns = [
-        r"\$[\s]*([\d,]+(?:\.\d+)?)",                 # $10, $10.00, $1,234.56
-        r"([\d,]+\.\d{2})\s*(?:dollars?|usd|us\s*\$)", # 10.00 usd
-        r"([\d,]+\.\d{2})\b",                          # 10.00
-        r"\$[\s]*([\d,]+)\b",                          # $10 (no decimal)
+    values, starts, ends, matched_texts, _, _ = scan_text(text)
+    return [
+        {"value": v, "start": s, "end": e, "matched": m, "full_match": m}
+        for v, s, e, m in zip(values, starts, ends, matched_texts)
     ]
 
-    for pat in patterns:
-        for match in re.finditer(pat, text, re.IGNORECASE):
-            raw = match.group(1)
-            amt_str = raw.replace(",", "")
-            try:
-                value = float(amt_str)
-                if value > 0:
-                    candidates.append({
-                        "value": value,
-                        "start": match.start(),
-                        "end": match.end(),
-                        "matched": match.group(0),
-                        "full_match": match.group(0),
-                    })
-            except ValueError:
-                continue
 
-    # De-dup: same value at same start index
-    seen = set()
-    uniq = []
-    for c in candidates:
-        key = (c["value"], c["start"])
-        if key in seen:
-            continue
-        seen.add(key)
-        uniq.append(c)
-
-    return uniq
+def find_note_region_start(text: str):
+    """Find an approximate "note/memo/message" region start (see scan_text)."""
+    _, _, _, _, note_region_start, note_marker = scan_text(text)
+    return (note_region_start, note_marker)
 
 
 # ----------------------------
 # Scoring
 # ----------------------------
 
-def score_amount_candidate(candidate, text, transaction_keywords, bad_context_keywords, note_region_start):
+_TRANSACTION_KEYWORDS = [
+    "you just received",
+    "you received",
+    "you got paid",
+    "payment received",
+    "transaction completed",
+    "received",
+    "paid",
+    "payment",
+    "sent",
+    "transfer",
+    "transaction",
+    "amount",
+    "deposit",
+    "credited",
+    "completed",
+]
+
+# Strong keywords for override (must be meaningful real-payment signals)
+_STRONG_TX_KEYWORDS = frozenset([
+    "you just received",
+    "you received",
+    "you got paid",
+    "received",
+    "credited",
+    "completed",
+    "deposit",
+    "payment received",
+    "transaction completed",
+])
+
+_BAD_CONTEXT_KEYWORDS = [
+    "note",
+    "memo",
+    "message",
+    "remark",
+    "description",
+    "for example",
+    "example",
+    "sample",
+    "illustration",
+    "e.g.",
+    "such as",
+]
+
+
+# Case-insensitive fallback matchers for when pyahocorasick is missing, one
+# compiled literal pattern per keyword, built once at import.
+_KEYWORD_PATTERNS = [
+    (re.compile(re.escape(kw), re.IGNORECASE), kw, True, kw in _STRONG_TX_KEYWORDS)
+    for kw in _TRANSACTION_KEYWORDS
+] + [
+    (re.compile(re.escape(kw), re.IGNORECASE), kw, False, False)
+    for kw in _BAD_CONTEXT_KEYWORDS
+]
+
+
+def _build_keyword_automaton():
+    """One Aho-Corasick automaton over all keyword sets (None if unavailable)."""
+    if ahocorasick is None:
+        return None
+    auto = ahocorasick.Automaton()
+    for kw in _TRANSACTION_KEYWORDS:
+        auto.add_word(kw, (kw, True, kw in _STRONG_TX_KEYWORDS))
+    for kw in _BAD_CONTEXT_KEYWORDS:
+        auto.add_word(kw, (kw, False, False))
+    auto.make_automaton()
+    return auto
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def build_keyword_index(text):
     """
-    Returns:
-      (final_score, matched_keyword, reason, tx_score, strong_tx_score, note_penalty, tx_override, in_note_region)
+    Locate every keyword occurrence in the full text, once per email.
+
+    Returns parallel lists (positions, ends, kws, tx_flags, strong_flags)
+    sorted by position, so the scoring kernel runs on flat int/bool arrays
+    with no per-hit tuple unpacking. positions drives the window sweep in
+    score_all_candidates.
+
+    Uses a single automaton pass when pyahocorasick is available, otherwise
+    one case-insensitive finditer walk per keyword.
+    """
+    hits = []
+    use_automaton = False
+    if _KEYWORD_AUTOMATON is not None:
+        # The automaton matches literal lowercase words, so lower the text
+        # once for this scan. str.lower() is NOT length-preserving for every
+        # character ('İ' U+0130 lowercases to two characters), and candidate
+        # offsets come from the original text -- only trust automaton offsets
+        # when the lengths agree, otherwise fall through to the IGNORECASE
+        # scans on the original text so both paths stay equivalent.
+        lower_text = text.lower()
+        use_automaton = len(lower_text) == len(text)
+
+    if use_automaton:
+        for end_idx, (kw, is_tx, is_strong) in _KEYWORD_AUTOMATON.iter(lower_text):
+            hits.append((end_idx - len(kw) + 1, end_idx + 1, kw, is_tx, is_strong))
+    else:
+        for pat, kw, is_tx, is_strong in _KEYWORD_PATTERNS:
+            for m in pat.finditer(text):
+                hits.append((m.start(), m.end(), kw, is_tx, is_strong))
+
+    hits.sort(key=lambda h: h[0])
+    positions = [h[0] for h in hits]
+    ends = [h[1] for h in hits]
+    kws = [h[2] for h in hits]
+    tx_flags = [h[3] for h in hits]
+    strong_flags = [h[4] for h in hits]
+    return (positions, ends, kws, tx_flags, strong_flags)
+
+
+def score_all_candidates(starts, ends, kw_index, note_region_start):
+    """
+    Score every candidate in one sweep over the keyword index.
+
+    Candidates arrive in document order, so both edges of the +/-140 context
+    window only move forward; two pointers into the sorted index replace a
+    pair of bisects per candidate, making the whole batch
+    O(candidates + index + in-window hits).
+
+    Returns parallel lists (scores, matched_keywords, reasons, tx_scores,
+    strong_tx_scores, note_penalties, tx_overrides, in_note_regions), which
+    may be shorter than the input when the early-exit heuristic stops the
+    sweep (see the warning at the break below).
 
     Rules:
     - Strongly prefer amounts near transaction keywords (received/paid/credited/completed).
@@ -165,90 +309,133 @@ def score_amount_candidate(candidate, text, transaction_keywords, bad_context_ke
     - Penalize (softly) amounts after note_region_start, but DO NOT hard reject.
     - If strong transaction proximity is high enough, override note penalties.
     """
-
-    start = candidate["start"]
-    end = candidate["end"]
-
-    # context window around candidate
-    ctx_start = max(0, start - 140)
-    ctx_end = min(len(text), end + 140)
-    ctx = text[ctx_start:ctx_end]
-
-    # Strong keywords for override (must be meaningful real-payment signals)
-    strong_tx_keywords = [
-        "you just received",
-        "you received",
-        "you got paid",
-        "received",
-        "credited",
-        "completed",
-        "deposit",
-        "payment received",
-        "transaction completed",
-    ]
-
-    matched_keyword = None
-    reasons = []
-
-    # ---- transaction score ----
-    tx_score = 0
-    strong_tx_score = 0
-
-    for kw in transaction_keywords:
-        pos = ctx.find(kw)
-        if pos >= 0:
-            dist = abs(pos - (start - ctx_start))
-            prox = max(0, 120 - dist)  # 0..120
-            tx_score += prox
-            if kw in strong_tx_keywords:
-                strong_tx_score += prox
-            if matched_keyword is None:
-                matched_keyword = kw
-            reasons.append(f"near_{kw}")
-
-    # ---- note penalties ----
-    note_penalty = 0
-    in_note_region = False
-
-    # Soft penalty if after note region start
-    if note_region_start is not None and start >= note_region_start:
-        in_note_region = True
-        note_penalty -= 180
-        reasons.append("after_note_region")
-
-    # Penalize if note-ish keywords are in the near context
-    bad_hits = 0
-    for bad_kw in bad_context_keywords:
-        bad_pos = ctx.find(bad_kw)
-        if bad_pos >= 0:
-            # If this is likely the note marker itself and the amount is before note region, ignore it
-            if note_region_start is not None and start < note_region_start:
-                abs_bad_pos = ctx_start + bad_pos
-                if abs(abs_bad_pos - note_region_start) <= 40:
-                    continue
-            bad_hits += 1
-
-    if bad_hits > 0:
-        note_penalty -= 220 * bad_hits
-        reasons.append(f"bad_context_hits:{bad_hits}")
-
-    # ---- override logic ----
-    # If strong tx score is high enough, override note penalties
-    tx_override = False
-    if strong_tx_score >= 60:
-        tx_override = True
+    positions, kw_ends, kws, tx_flags, strong_flags = kw_index
+    n_hits = len(positions)
+
+    scores = []
+    matched_kws = []
+    reason_strs = []
+    tx_scores = []
+    strong_tx_scores = []
+    note_penalties = []
+    tx_overrides = []
+    in_note_regions = []
+
+    lo = 0
+    hi = 0
+
+    for start, end in zip(starts, ends):
+        ctx_start = start - 140
+        ctx_end = end + 140
+
+        while lo < n_hits and positions[lo] < ctx_start:
+            lo += 1
+        while hi < n_hits and positions[hi] <= ctx_end:
+            hi += 1
+
+        matched_keyword = None
+        reasons = []
+
+        # ---- transaction score + note-ish context, one pass over indexed hits ----
+        # Only the leftmost in-window occurrence of each keyword counts,
+        # matching what the old ctx.find scans saw.
+        tx_score = 0
+        strong_tx_score = 0
+        bad_hits = 0
+        seen = set()
+
+        for i in range(lo, hi):
+            pos = positions[i]
+            kw = kws[i]
+            if kw_ends[i] > ctx_end or kw in seen:
+                continue
+            seen.add(kw)
+            if tx_flags[i]:
+                dist = abs(pos - start)
+                prox = max(0, 120 - dist)  # 0..120
+                tx_score += prox
+                if strong_flags[i]:
+                    strong_tx_score += prox
+                if matched_keyword is None:
+                    matched_keyword = kw
+                if _EMIT_DEBUG:
+                    reasons.append(f"near_{kw}")
+            else:
+                # If this is likely the note marker itself and the amount is before note region, ignore it
+                if note_region_start is not None and start < note_region_start:
+                    if abs(pos - note_region_start) <= 40:
+                        continue
+                bad_hits += 1
+
+        # ---- note penalties ----
         note_penalty = 0
-        reasons.append("tx_override_note_penalty")
-
-    # ---- position bonus (small) ----
-    # Slight preference for earlier occurrences but NOT enough to beat tx signals
-    position_bonus = max(0, 300 - (start // 40))  # 0..300-ish
-
-    # ---- final score ----
-    final_score = tx_score + note_penalty + position_bonus
+        in_note_region = False
+
+        # Soft penalty if after note region start
+        if note_region_start is not None and start >= note_region_start:
+            in_note_region = True
+            note_penalty -= 180
+            if _EMIT_DEBUG:
+                reasons.append("after_note_region")
+
+        if bad_hits > 0:
+            note_penalty -= 220 * bad_hits
+            if _EMIT_DEBUG:
+                reasons.append(f"bad_context_hits:{bad_hits}")
+
+        # ---- override logic ----
+        # If strong tx score is high enough, override note penalties
+        tx_override = False
+        if strong_tx_score >= 60:
+            tx_override = True
+            note_penalty = 0
+            if _EMIT_DEBUG:
+                reasons.append("tx_override_note_penalty")
+
+        # ---- position bonus (small) ----
+        # Slight preference for earlier occurrences but NOT enough to beat tx signals
+        position_bonus = max(0, 300 - (start // 40))  # 0..300-ish
+
+        # ---- final score ----
+        final_score = tx_score + note_penalty + position_bonus
+
+        if _EMIT_DEBUG:
+            reason = ",".join(reasons) if reasons else "no_signals"
+        else:
+            reason = ""
+
+        scores.append(final_score)
+        matched_kws.append(matched_keyword)
+        reason_strs.append(reason)
+        tx_scores.append(tx_score)
+        strong_tx_scores.append(strong_tx_score)
+        note_penalties.append(note_penalty)
+        tx_overrides.append(tx_override)
+        in_note_regions.append(in_note_region)
+
+        # Early-exit heuristic: a candidate this strongly anchored to real
+        # transaction language is almost always the right answer, so stop
+        # scoring here. WARNING: this can change the chosen amount, not just
+        # debug output -- a later candidate that exhaustive scoring would
+        # have ranked higher (tx_score alone can exceed 1000, well past this
+        # cutoff) is simply never scored. If a wrong amount traces back to
+        # the picker, suspect this break first.
+        if strong_tx_score >= 120 and final_score > 400:
+            break
+
+    return (scores, matched_kws, reason_strs, tx_scores, strong_tx_scores,
+            note_penalties, tx_overrides, in_note_regions)
+
+
+def score_amount_candidate(start, end, kw_index, note_region_start):
+    """
+    Score a single candidate (see score_all_candidates for the rules).
 
-    reason = ",".join(reasons) if reasons else "no_signals"
-    return (final_score, matched_keyword, reason, tx_score, strong_tx_score, note_penalty, tx_override, in_note_region)
+    Returns:
+      (final_score, matched_keyword, reason, tx_score, strong_tx_score, note_penalty, tx_override, in_note_region)
+    """
+    results = score_all_candidates([start], [end], kw_index, note_region_start)
+    return tuple(col[0] for col in results)
 
 
 # ----------------------------
@@ -258,54 +445,49 @@ def score_amount_candidate(candidate, text, transaction_keywords, bad_context_ke
 def pick_transaction_amount(email_content: str, email_subject: str):
     """
     Returns: (amount_string, debug_info_dict)
+
+    Convenience wrapper: normalizes subject+content, then delegates to
+    pick_transaction_amount_from_text. parse_email calls the _from_text
+    variant directly so the email is only normalized once.
     """
-    combined_text = normalize_text(f"{email_subject} {email_content}")
+    return pick_transaction_amount_from_text(
+        normalize_text(f"{email_subject} {email_content}")
+    )
 
-    note_region_start, note_marker = find_note_region_start(combined_text)
-
-    transaction_keywords = [
-        "you just received",
-        "you received",
-        "you got paid",
-        "payment received",
-        "transaction completed",
-        "received",
-        "paid",
-        "payment",
-        "sent",
-        "transfer",
-        "transaction",
-        "amount",
-        "deposit",
-        "credited",
-        "completed",
-    ]
 
-    bad_context_keywords = [
-        "note",
-        "memo",
-        "message",
-        "remark",
-        "description",
-        "for example",
-        "example",
-        "sample",
-        "illustration",
-        "e.g.",
-        "such as",
-    ]
+def pick_transaction_amount_from_text(combined_text: str):
+    """
+    Returns: (amount_string, debug_info_dict)
 
-    candidates = extract_currency_candidates(combined_text)
+    Expects already-normalized text (see normalize_text).
+    """
+    # Short-circuit: no "$" and no x.xx anywhere means no candidate can
+    # exist, so skip note-region detection, extraction, and scoring.
+    if "$" not in combined_text and _DECIMAL_RE.search(combined_text) is None:
+        return ("", {
+            "note_region_start": None,
+            "note_marker": None,
+            "total_candidates": 0,
+            "rejected_due_to_low_confidence": 0,
+            "accepted_by_tx_override": 0,
+            "reason": "no_currency_tokens",
+            "chosen_amount": None,
+            "matched_keyword": None,
+            "chosen_index": None,
+            "chosen_matched_text": None,
+        })
+
+    (values, starts, ends, matched_texts, note_region_start, note_marker) = scan_text(combined_text)
 
     debug = {
         "note_region_start": note_region_start,
         "note_marker": note_marker,
-        "total_candidates": len(candidates),
+        "total_candidates": len(values),
         "rejected_due_to_low_confidence": 0,
         "accepted_by_tx_override": 0,
     }
 
-    if not candidates:
+    if not values:
         debug.update({
             "reason": "no_candidates",
             "chosen_amount": None,
@@ -315,56 +497,47 @@ def pick_transaction_amount(email_content: str, email_subject: str):
         })
         return ("", debug)
 
-    scored = []
-    for idx, cand in enumerate(candidates):
-        (score, mk, reason, tx_score, strong_tx_score, note_penalty, tx_override, in_note_region) = score_amount_candidate(
-            cand, combined_text, transaction_keywords, bad_context_keywords, note_region_start
-        )
-
-        if tx_override:
-            debug["accepted_by_tx_override"] += 1
-
-        scored.append({
-            "candidate": cand,
-            "score": score,
-            "matched_keyword": mk,
-            "reason": reason,
-            "tx_score": tx_score,
-            "strong_tx_score": strong_tx_score,
-            "note_penalty": note_penalty,
-            "tx_override": tx_override,
-            "in_note_region": in_note_region,
-            "index": idx,
-        })
-
-    # sort: score desc, then earlier occurrence
-    scored.sort(key=lambda x: (-x["score"], x["candidate"]["start"]))
-
-    # top 3 debug summary
-    top3 = []
-    for s in scored[:3]:
-        top3.append({
-            "value": s["candidate"]["value"],
-            "start": s["candidate"]["start"],
-            "score": s["score"],
-            "tx_score": s["tx_score"],
-            "strong_tx_score": s["strong_tx_score"],
-            "note_penalty": s["note_penalty"],
-            "tx_override": s["tx_override"],
-            "in_note_region": s["in_note_region"],
-            "reason": s["reason"],
-        })
-    debug["top3_candidates"] = top3
-
-    best = scored[0]
+    kw_index = build_keyword_index(combined_text)
+
+    # Scoring results as parallel lists alongside values/starts/ends (may be
+    # shorter than values if the sweep stopped at a definitive winner).
+    (scores, matched_kws, reason_strs, tx_scores, strong_tx_scores,
+     note_penalties, tx_overrides, in_note_regions) = score_all_candidates(
+        starts, ends, kw_index, note_region_start
+    )
+
+    debug["accepted_by_tx_override"] = sum(1 for t in tx_overrides if t)
+
+    # order: score desc, then earlier occurrence (starts are increasing, so
+    # the candidate index doubles as the position tie-break)
+    order = sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+
+    # top 3 debug summary (only when debug output is requested)
+    if _EMIT_DEBUG:
+        top3 = []
+        for i in order[:3]:
+            top3.append({
+                "value": values[i],
+                "start": starts[i],
+                "score": scores[i],
+                "tx_score": tx_scores[i],
+                "strong_tx_score": strong_tx_scores[i],
+                "note_penalty": note_penalties[i],
+                "tx_override": tx_overrides[i],
+                "in_note_region": in_note_regions[i],
+                "reason": reason_strs[i],
+            })
+        debug["top3_candidates"] = top3
+
+    best = order[0]
 
     # Acceptance rules (safe):
     # - If strong_tx_score is decent OR tx_score is decent and not heavily penalized
     # - Avoid accepting a pure note amount:
     #   If it's in note region AND has no strong tx score, reject.
-    best_tx = best["tx_score"]
-    best_strong = best["strong_tx_score"]
-    best_in_note = best["in_note_region"]
+    best_tx = tx_scores[best]
+    best_strong = strong_tx_scores[best]
+    best_in_note = in_note_regions[best]
 
     confident = False
 
@@ -374,34 +547,34 @@ def pick_transaction_amount(email_content: str, email_subject: str):
 
     # Normal approval path: good tx_score and final score positive, and not in_note without strong tx
     if not confident:
-        if best["score"] > 0 and best_tx >= 40:
+        if scores[best] > 0 and best_tx >= 40:
             if not (best_in_note and best_strong < 60):
                 confident = True
 
     if confident:
-        amount_value = best["candidate"]["value"]
+        amount_value = values[best]
         debug.update({
             "chosen_amount": amount_value,
-            "matched_keyword": best["matched_keyword"],
-            "chosen_index": best["candidate"]["start"],
-            "chosen_matched_text": best["candidate"]["matched"][:80],
-            "score": best["score"],
+            "matched_keyword": matched_kws[best],
+            "chosen_index": starts[best],
+            "chosen_matched_text": matched_texts[best][:80],
+            "score": scores[best],
             "tx_score": best_tx,
             "strong_tx_score": best_strong,
-            "note_penalty": best["note_penalty"],
-            "tx_override": best["tx_override"],
-            "reason": best["reason"],
+            "note_penalty": note_penalties[best],
+            "tx_override": tx_overrides[best],
+            "reason": reason_strs[best],
         })
         return (str(amount_value), debug)
 
     debug["rejected_due_to_low_confidence"] = 1
     debug.update({
         "reason": "no_strong_match",
-        "best_score": best["score"],
+        "best_score": scores[best],
         "best_tx_score": best_tx,
         "best_strong_tx_score": best_strong,
         "best_in_note": best_in_note,
-        "best_reason": best["reason"],
+        "best_reason": reason_strs[best],
         "chosen_amount": None,
         "matched_keyword": None,
         "chosen_index": None,
@@ -414,6 +587,17 @@ def pick_transaction_amount(email_content: str, email_subject: str):
 # Main parse
 # ----------------------------
 
+# Classification word lists, matched case-insensitively as plain substrings
+# (same semantics as the old `word in lowered_text` checks).
+_PAY_SENT_RE = re.compile(
+    r"sent|paid|payment|transferred|received|deposit|credited", re.IGNORECASE
+)
+_PAY_REQUEST_RE = re.compile(r"request|asking", re.IGNORECASE)
+_EXPIRY_RE = re.compile(r"expired|expiry|invalid|cancelled", re.IGNORECASE)
+_EXPIRED_RE = re.compile(r"expired", re.IGNORECASE)
+_ACTIVE_RE = re.compile(r"active", re.IGNORECASE)
+
+
 def parse_email(email_content: str, email_subject: str):
     """
     Returns dict with:
@@ -431,32 +615,37 @@ def parse_email(email_content: str, email_subject: str):
 
     combined_text = normalize_text(f"{email_subject} {email_content}")
 
-    amount_str, amount_debug = pick_transaction_amount(email_content, email_subject)
+    # No digits anywhere means no amount candidate is possible; don't even
+    # enter the picker.
+    if _DIGIT_RE.search(combined_text) is not None:
+        amount_str, amount_debug = pick_transaction_amount_from_text(combined_text)
+    else:
+        amount_str, amount_debug = "", None
     result["amount"] = amount_str
 
-    # include debug only if short
-    if amount_debug:
-        debug_str = json.dumps(amount_debug, separators=(",", ":"))
+    # include debug only when requested, and only if short
+    if _EMIT_DEBUG and amount_debug:
+        debug_str = _json_dumps(amount_debug)
         # allow a bit larger; if it grows, we still keep it safe
         if len(debug_str) < 900:
             result["amount_debug"] = debug_str
 
     # pay_type
-    if any(w in combined_text for w in ["sent", "paid", "payment", "transferred", "received", "deposit", "credited"]):
+    if _PAY_SENT_RE.search(combined_text):
         result["pay_type"] = "sent"
-    elif any(w in combined_text for w in ["request", "requested", "asking"]):
+    elif _PAY_REQUEST_RE.search(combined_text):
         result["pay_type"] = "request"
     else:
         result["pay_type"] = "unknown"
 
     # expired
-    if any(w in combined_text for w in ["expired", "expiry", "invalid", "cancelled"]):
+    if _EXPIRY_RE.search(combined_text):
         result["is_expired"] = True
 
     # request_status
-    if "expired" in combined_text:
+    if _EXPIRED_RE.search(combined_text):
         result["request_status"] = "expired"
-    elif "active" in combined_text:
+    elif _ACTIVE_RE.search(combined_text):
         result["request_status"] = "active"
     else:
         result["request_status"] = ""
@@ -468,6 +657,22 @@ def parse_email(email_content: str, email_subject: str):
     return result
 
 
+@lru_cache(maxsize=4096)
+def _parse_email_cached(email_content: str, email_subject: str):
+    return parse_email(email_content, email_subject)
+
+
+def parse_email_memoized(email_content: str, email_subject: str):
+    """
+    parse_email with an LRU cache keyed on the raw (content, subject) pair.
+
+    For bulk pipelines that replay the same mailbox or webhook payloads;
+    identical emails parse once. Returns a fresh shallow copy per call so
+    callers can't mutate the cached entry.
+    """
+    return dict(_parse_email_cached(email_content, email_subject))
+
+
 # ----------------------------
 # Self-test mode
 # ----------------------------
@@ -523,16 +728,77 @@ def self_test():
 # Entrypoint
 # ----------------------------
 
+# Prebuilt response for the catch-all error paths; serialized once at import
+# so adversarial input streams don't pay dict construction + encoding per
+# failure.
+_ERROR_RESULT = {
+    "amount": "",
+    "pay_type": "",
+    "request_status": "",
+    "is_expired": True,
+    "receipt_memo": "",
+    "note_part": "",
+    "subject": "",
+}
+_ERROR_JSON = _json_dumps(_ERROR_RESULT)
+
+
+def serve_stdin():
+    """
+    Long-lived server mode (--server): read "length\\n<json>" frames from
+    stdin and write "length\\n<json>" responses to stdout until EOF.
+
+    Lets the host spawn one interpreter for many emails instead of paying
+    Python startup per email. Lengths count bytes, and frames are exchanged
+    on the raw byte streams so multi-byte characters can't skew the framing.
+    """
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+
+    while True:
+        header = stdin.readline()
+        if not header:
+            break
+        header = header.strip()
+        if not header:
+            continue
+
+        try:
+            length = int(header)
+        except ValueError:
+            print(f"Invalid frame header: {header!r}", file=sys.stderr)
+            break
+
+        raw = stdin.read(length)
+        if len(raw) < length:
+            print("Truncated frame on stdin", file=sys.stderr)
+            break
+
+        try:
+            data = _json_loads(raw)
+            result = parse_email_memoized(data.get("content", ""), data.get("subject", ""))
+            payload = _json_dumps(result).encode("utf-8")
+        except Exception as e:
+            print(f"Parser error: {e}", file=sys.stderr)
+            payload = _ERROR_JSON.encode("utf-8")
+        stdout.write(b"%d\n%s" % (len(payload), payload))
+        stdout.flush()
+
+
 def main():
     if os.getenv("PARSER_SELFTEST") == "1":
         self_test()
         return
 
+    if "--server" in sys.argv[1:]:
+        serve_stdin()
+        return
+
     try:
         raw = sys.stdin.read()
         try:
-            data = json.loads(raw)
-        except json.JSONDecodeError as e:
+            data = _json_loads(raw)
+        except ValueError as e:  # covers json.JSONDecodeError and orjson.JSONDecodeError
             print(f"Error parsing input JSON: {e}", file=sys.stderr)
             sys.exit(1)
 
@@ -545,23 +811,15 @@ def main():
         if result.get("amount_debug"):
             print(f"Amount picker debug: {result['amount_debug']}", file=sys.stderr)
 
-        print(json.dumps(result, ensure_ascii=False))
+        print(_json_dumps(result))
 
     except Exception as e:
         print(f"Parser error: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
-
-        error_result = {
-            "amount": "",
-            "pay_type": "",
-            "request_status": "",
-            "is_expired": True,
-            "receipt_memo": "",
-            "note_part": "",
-            "subject": "",
-        }
-        print(json.dumps(error_result))
+        if _EMIT_DEBUG:
+            import traceback
+            traceback.print_exc(file=sys.stderr)
+
+        print(_ERROR_JSON)
         sys.exit(1)
 
 